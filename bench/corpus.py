@@ -0,0 +1,89 @@
+# bench/corpus.py
+"""Генератор реалістичної суміші апдейтів і збереження її для повторних прогонів.
+
+    python -m bench.corpus 5000 bench/corpus.jsonl
+"""
+import json
+import random
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+from bot import LABELS
+
+# Частки типів апдейтів у суміші
+MIX = {
+    "start": 0.10,
+    "contacts": 0.15,
+    "change_lang": 0.05,
+    "set_lang": 0.05,
+    "back_channel": 0.05,
+    "noise": 0.50,
+    "sticker": 0.10,
+}
+NOISE = ("hi", "how much?", "is the car still available?", "👍", "ok", "thanks", "price for ATV?")
+
+
+def _user(uid: int) -> Dict[str, Any]:
+    return {"id": uid, "is_bot": False, "first_name": f"User{uid}", "language_code": "ru"}
+
+
+def _message(update_id: int, uid: int, **extra: Any) -> Dict[str, Any]:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id, "date": 1700000000 + update_id,
+            "chat": {"id": uid, "type": "private"}, "from": _user(uid), **extra,
+        },
+    }
+
+
+def make_update(kind: str, update_id: int, uid: int, rng: random.Random) -> Dict[str, Any]:
+    lang = rng.choice(("ru", "ka", "en"))
+    if kind == "start":
+        return _message(update_id, uid, text="/start", entities=[{"type": "bot_command", "offset": 0, "length": 6}])
+    if kind in ("contacts", "back_channel"):
+        return _message(update_id, uid, text=LABELS[kind][lang])
+    if kind == "change_lang":
+        return _message(update_id, uid, text=LABELS["lang"][lang])
+    if kind == "set_lang":
+        return {
+            "update_id": update_id,
+            "callback_query": {
+                "id": str(update_id), "chat_instance": str(uid), "from": _user(uid),
+                "data": f"setlang:{lang}",
+                "message": {
+                    "message_id": update_id, "date": 1700000000,
+                    "chat": {"id": uid, "type": "private"}, "text": "🌐",
+                },
+            },
+        }
+    if kind == "sticker":
+        sticker = {"file_id": "S", "file_unique_id": "s", "type": "regular",
+                   "width": 512, "height": 512, "is_animated": False, "is_video": False}
+        return _message(update_id, uid, sticker=sticker)
+    return _message(update_id, uid, text=rng.choice(NOISE))
+
+
+def generate(count: int, users: int = 500, seed: int = 1) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    kinds, weights = zip(*MIX.items())
+    return [
+        make_update(rng.choices(kinds, weights)[0], update_id, 100000 + rng.randrange(users), rng)
+        for update_id in range(1, count + 1)
+    ]
+
+
+def save(updates: List[Dict[str, Any]], path: Path) -> None:
+    with path.open("w", encoding="utf-8") as f:
+        for update in updates:
+            f.write(json.dumps(update, ensure_ascii=False) + "\n")
+
+
+def load(path: Path) -> List[Dict[str, Any]]:
+    with path.open(encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+if __name__ == "__main__":
+    save(generate(int(sys.argv[1])), Path(sys.argv[2]))
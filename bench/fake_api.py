@@ -0,0 +1,107 @@
+# bench/fake_api.py
+"""Локальний замінник api.telegram.org для навантажувальних тестів.
+
+Приймає POST /bot<token>/<method> (form-data або JSON), записує кожен виклик
+з часом отримання, може додавати затримку та відповідати 429 з retry_after.
+"""
+import asyncio
+import itertools
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+from fastpath import loads
+
+
+@dataclass
+class Call:
+    method: str
+    chat_id: Optional[int]
+    received_at: float  # time.perf_counter()
+
+
+@dataclass
+class FakeBotAPI:
+    latency: float = 0.0  # секунди на кожен виклик
+    rate_limit: float = 0.0  # частка викликів, що отримують 429
+    retry_after: int = 1
+    webhook_url: str = ""
+    calls: List[Call] = field(default_factory=list)
+    throttled: int = 0
+
+    def __post_init__(self) -> None:
+        self._ids = itertools.count(1)
+        self._runner: Optional[web.AppRunner] = None
+        self.base = ""
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        app = web.Application(client_max_size=16 * 1024 * 1024)
+        app.router.add_post("/bot{token}/{method}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base = f"http://{host}:{port}"
+        return self.base
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def count(self, *methods: str) -> int:
+        return sum(1 for c in self.calls if not methods or c.method in methods)
+
+    async def _params(self, request: web.Request) -> Dict[str, Any]:
+        if request.content_type == "application/json":
+            return loads(await request.read())
+        # urlencoded і multipart; завантажені файли приходять як FileField
+        return {key: value if isinstance(value, str) else None for key, value in (await request.post()).items()}
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        params = await self._params(request)
+        chat_id = params.get("chat_id")
+        self.calls.append(Call(method, int(chat_id) if chat_id else None, time.perf_counter()))
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.rate_limit and random.random() < self.rate_limit:
+            self.throttled += 1
+            return web.json_response({
+                "ok": False,
+                "error_code": 429,
+                "description": f"Too Many Requests: retry after {self.retry_after}",
+                "parameters": {"retry_after": self.retry_after},
+            }, status=429)
+        return web.json_response({"ok": True, "result": self._result(method, params)})
+
+    def _result(self, method: str, params: Dict[str, Any]) -> Any:
+        if method == "getMe":
+            return {"id": 42, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+        if method == "getWebhookInfo":
+            return {
+                "url": self.webhook_url, "has_custom_certificate": False, "pending_update_count": 0,
+                "max_connections": 40, "allowed_updates": ["message", "callback_query"],
+            }
+        if method == "setWebhook":
+            self.webhook_url = params.get("url", "")
+            return True
+        if method.startswith("send"):
+            message: Dict[str, Any] = {
+                "message_id": next(self._ids), "date": int(time.time()),
+                "chat": {"id": int(params.get("chat_id", 0)), "type": "private"},
+            }
+            if method == "sendPhoto":
+                photo = params.get("photo") or ""
+                # Новий upload приходить як "attach://<field>" — видаємо йому file_id
+                file_id = photo if photo and not photo.startswith("attach://") else f"photo-{message['message_id']}"
+                message["photo"] = [{"file_id": file_id, "file_unique_id": "u", "width": 1280, "height": 720}]
+            else:
+                message["text"] = params.get("text", "")
+            return message
+        return True
@@ -0,0 +1,73 @@
+# bench/fastpath.py
+"""Апдейтів/сек через конвеєр вебхука з попереднім фільтром і без нього.
+
+Запуск з кореня репозиторію:  python -m bench.fastpath
+Суміш: 70% довільний текст, 10% стікери, 20% кнопки й команди. Хендлери
+повертають методи (відповідь у тілі вебхука), тож мережі тут немає.
+"""
+import asyncio
+import json
+import random
+import time
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+
+from bot import LABELS, ROUTES, router
+from fastpath import loads
+
+N = 20_000
+
+
+def _message(update_id: int, **extra) -> bytes:
+    user = {"id": 1000 + update_id % 50, "is_bot": False, "first_name": "Bench"}
+    message = {
+        "message_id": update_id, "date": 1700000000,
+        "chat": {"id": user["id"], "type": "private"}, "from": user, **extra,
+    }
+    return json.dumps({"update_id": update_id, "message": message}).encode()
+
+
+def make_corpus(n: int) -> list:
+    labels = [label for by_lang in LABELS.values() for label in by_lang.values()] + ["/ping"]
+    corpus = []
+    for i in range(n):
+        roll = random.random()
+        if roll < 0.7:
+            corpus.append(_message(i, text=f"hello, how much is the car #{i}?"))
+        elif roll < 0.8:
+            sticker = {"file_id": "S", "file_unique_id": "s", "type": "regular",
+                       "width": 512, "height": 512, "is_animated": False, "is_video": False}
+            corpus.append(_message(i, sticker=sticker))
+        else:
+            corpus.append(_message(i, text=random.choice(labels)))
+    return corpus
+
+
+async def _run(label: str, bot: Bot, dp: Dispatcher, corpus: list, fastpath: bool) -> float:
+    start = time.perf_counter()
+    for raw in corpus:
+        if fastpath:
+            data = loads(raw)
+            if not ROUTES.accepts(data):
+                continue
+        else:
+            data = json.loads(raw)
+        await dp.feed_update(bot, Update.model_validate(data, context={"bot": bot}))
+    rate = len(corpus) / (time.perf_counter() - start)
+    print(f"{label:<20} {rate:10.0f} updates/s")
+    return rate
+
+
+async def main() -> None:
+    corpus = make_corpus(N)
+    bot = Bot("42:BENCH")
+    dp = Dispatcher()
+    dp.include_router(router)
+    before = await _run("without fast path", bot, dp, corpus, fastpath=False)
+    after = await _run("with fast path", bot, dp, corpus, fastpath=True)
+    print(f"speedup: {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,190 @@
+# bench/load.py
+"""Навантажувальний прогін webhook_post проти фейкового Bot API.
+
+    python -m bench.load --rate 200 --count 3000 [--mode async] [--latency-ms 50] [--rate-limit 0.01]
+    python -m bench.load --compare bench/results/<a>.json bench/results/<b>.json
+
+Апдейти з корпусу (bench/corpus.py або --corpus файл) надсилаються з заданою
+частотою, не більше 40 одночасно (як max_connections у Telegram). Результат —
+пропускна здатність, p50/p95/p99 наскрізної затримки та кількість викликів
+Bot API на апдейт; зберігається в bench/results/ для порівняння між комітами.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from bench.fake_api import FakeBotAPI
+
+TOKEN = "42:BENCH"
+RESULTS_DIR = Path(__file__).parent / "results"
+TELEGRAM_MAX_CONNECTIONS = 40
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def _commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    api = FakeBotAPI(latency=args.latency_ms / 1000, rate_limit=args.rate_limit)
+    base = await api.start()
+    tmp = Path(tempfile.mkdtemp())
+    os.environ.update(
+        BOT_TOKEN=TOKEN,
+        WEBHOOK_BASE="https://bench.invalid",
+        TELEGRAM_API_BASE=base,
+        PREFS_DB=str(tmp / "prefs.sqlite3"),
+        MEDIA_CACHE_PATH=str(tmp / "media_cache.json"),
+        WEBHOOK_LOCK=str(tmp / "webhook.lock"),
+        WEBHOOK_ASYNC="1" if args.mode == "async" else "0",
+        LOG_LEVEL=args.log_level,
+    )
+    # bot.py і server.py читають змінні середовища при імпорті — лише після os.environ.update,
+    # інакше прогін писав би фейкові file_id і мови в робочі media_cache.json / prefs.sqlite3
+    import httpx
+    import server
+    from bench import corpus
+    from metrics import handler_errors
+
+    updates = corpus.load(Path(args.corpus)) if args.corpus else corpus.generate(args.count, seed=args.seed)
+
+    # В async-режимі відповідь вебхука приходить до обробки — кінець фіксуємо у воркері
+    processed: Dict[int, float] = {}
+    if server.pool is not None:
+        process = server.pool.process
+
+        async def timed(update):
+            try:
+                await process(update)
+            finally:
+                processed[update.update_id] = time.perf_counter()
+
+        server.pool.process = timed
+
+    started = time.perf_counter()
+    await server.on_startup()
+    startup_ms = (time.perf_counter() - started) * 1000
+    startup_calls = [c.method for c in api.calls]
+    api.calls.clear()
+
+    scheduled: Dict[int, float] = {}
+    acked: Dict[int, float] = {}
+    in_response = 0
+    slots = asyncio.Semaphore(TELEGRAM_MAX_CONNECTIONS)
+    transport = httpx.ASGITransport(app=server.app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def send(update: Dict[str, Any], at: float) -> None:
+            nonlocal in_response
+            await asyncio.sleep(max(0.0, at - time.perf_counter()))
+            uid = update["update_id"]
+            scheduled[uid] = at
+            async with slots:
+                response = await client.post(server.WEBHOOK_PATH, content=json.dumps(update))
+            acked[uid] = time.perf_counter()
+            if "method" in response.json():
+                in_response += 1
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(send(u, t0 + i / args.rate) for i, u in enumerate(updates)))
+        await server.on_shutdown()  # у async-режимі дочікується черги
+
+    finished = {uid: processed.get(uid, acked[uid]) for uid in acked}
+    latencies = [(finished[uid] - scheduled[uid]) * 1000 for uid in finished]
+    elapsed = max(finished.values()) - t0
+    await api.stop()
+
+    by_method: Dict[str, int] = {}
+    for call in api.calls:
+        by_method[call.method] = by_method.get(call.method, 0) + 1
+
+    n = len(updates)
+    return {
+        "commit": _commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {
+            "mode": args.mode, "rate": args.rate, "updates": n,
+            "latency_ms": args.latency_ms, "rate_limit": args.rate_limit,
+            "corpus": args.corpus or f"generated(seed={args.seed})",
+        },
+        "startup": {"ms": round(startup_ms, 1), "api_calls": startup_calls},
+        "throughput_per_s": round(n / elapsed, 1),
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 0.50), 2),
+            "p95": round(_percentile(latencies, 0.95), 2),
+            "p99": round(_percentile(latencies, 0.99), 2),
+            "max": round(max(latencies), 2),
+        },
+        "outbound_calls_per_update": round(len(api.calls) / n, 3),
+        "in_response_calls_per_update": round(in_response / n, 3),
+        "outbound_by_method": by_method,
+        "throttled_429": api.throttled,
+        "handler_errors": sum(handler_errors.values.values()),
+    }
+
+
+def _print(result: Dict[str, Any]) -> None:
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+def compare(paths: List[str]) -> None:
+    results = [json.loads(Path(p).read_text(encoding="utf-8")) for p in paths]
+    rows = [
+        ("commit", lambda r: r["commit"]),
+        ("mode", lambda r: r["config"]["mode"]),
+        ("throughput/s", lambda r: r["throughput_per_s"]),
+        ("p50 ms", lambda r: r["latency_ms"]["p50"]),
+        ("p95 ms", lambda r: r["latency_ms"]["p95"]),
+        ("p99 ms", lambda r: r["latency_ms"]["p99"]),
+        ("outbound/update", lambda r: r["outbound_calls_per_update"]),
+        ("in-response/update", lambda r: r["in_response_calls_per_update"]),
+        ("startup ms", lambda r: r["startup"]["ms"]),
+    ]
+    for label, get in rows:
+        print(f"{label:<20}" + "".join(f"{str(get(r)):>16}" for r in results))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=200.0, help="updates per second")
+    parser.add_argument("--count", type=int, default=2000, help="generated updates (without --corpus)")
+    parser.add_argument("--corpus", help="JSONL file from bench.corpus to replay")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--mode", choices=("sync", "async"), default="sync")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="fake Bot API delay per call")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="share of calls answered with 429")
+    parser.add_argument("--log-level", default="CRITICAL", help="429s are counted in the result anyway")
+    parser.add_argument("--out", help="result file (default bench/results/<commit>-<mode>.json)")
+    parser.add_argument("--compare", nargs="+", metavar="RESULT", help="print saved results side by side")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(args.compare)
+        return
+
+    result = asyncio.run(run(args))
+    _print(result)
+    out = Path(args.out) if args.out else RESULTS_DIR / f"{result['commit']}-{args.mode}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    print(f"saved to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# bench/logs.py
+"""Скільки часу event loop витрачає на логування одного апдейта.
+
+Запуск з кореня репозиторію:  python -m bench.logs
+"before": basicConfig-подібний StreamHandler у файл, повний payload + рядок aiogram.event.
+"after":  черга з фоновим записом і один компактний рядок (logs.UpdateLog).
+"""
+import logging
+import queue
+import tempfile
+import time
+from logging.handlers import QueueListener
+
+from aiogram.types import Update
+
+from logs import RedactingQueueHandler, UpdateLog, redact_key
+
+N = 20_000
+PAYLOAD = {
+    "update_id": 1,
+    "message": {
+        "message_id": 1, "date": 1700000000, "text": "📞 Contacts",
+        "chat": {"id": 123456789, "type": "private", "first_name": "Bench", "username": "bench"},
+        "from": {"id": 123456789, "is_bot": False, "first_name": "Bench", "username": "bench",
+                 "language_code": "en"},
+    },
+}
+
+
+def _logger(handler: logging.Handler) -> logging.Logger:
+    logger = logging.getLogger(f"bench.{id(handler)}")
+    logger.handlers[:] = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+def before(stream) -> float:
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    log = _logger(handler)
+    start = time.perf_counter()
+    for i in range(N):
+        log.info("Update received: %s", PAYLOAD)
+        log.info("Update id=%s is %s. Duration %d ms by bot id=%d", i, "handled", 0, 42)
+    return (time.perf_counter() - start) / N * 1e6
+
+
+def after(stream, rate: float) -> float:
+    q: "queue.SimpleQueue" = queue.SimpleQueue()
+    handler = RedactingQueueHandler(q, secrets=["42:BENCH"])
+    handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    listener = QueueListener(q, logging.StreamHandler(stream))
+    listener.start()
+    update_log = UpdateLog(_logger(handler), rates={"*": rate}, redact=["chat"], key=redact_key("42:BENCH"))
+    # Новий update_id на кожен прогін: Update.event_type кешується за update_id
+    update = Update.model_validate({**PAYLOAD, "update_id": int(rate * 1000) + 2})
+    start = time.perf_counter()
+    for _ in range(N):
+        update_log.record(update, "on_contacts", 0.0004)
+    elapsed = time.perf_counter() - start
+    listener.stop()
+    return elapsed / N * 1e6
+
+
+def main() -> None:
+    with tempfile.TemporaryFile("w") as stream:
+        old = before(stream)
+        new = after(stream, 1.0)
+        sampled = after(stream, 0.1)
+    print(f"before: {old:6.1f} µs/update on the event loop")
+    print(f"after:  {new:6.1f} µs/update on the event loop (sampling 100%)")
+    print(f"after:  {sampled:6.1f} µs/update on the event loop (sampling 10%)")
+
+
+if __name__ == "__main__":
+    main()
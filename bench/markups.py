@@ -0,0 +1,38 @@
+# bench/markups.py
+"""Вартість клавіатури на одну відповідь: збирати заново vs брати готову.
+
+Запуск з кореня репозиторію:  python -m bench.markups
+"""
+import time
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.methods import SendMessage
+
+from bot import MAIN_KB, TXT, make_main_kb
+from markups import CachedMarkupSession
+
+TOKEN = "42:BENCH"
+N = 20_000
+
+
+def _run(label: str, session: AiohttpSession, markup_of) -> float:
+    bot = Bot(TOKEN, session=session)
+    start = time.perf_counter()
+    for i in range(N):
+        lang = ("ru", "ka", "en")[i % 3]
+        method = SendMessage(chat_id=1, text=TXT[lang]["lang_set"], reply_markup=markup_of(lang))
+        session.build_form_data(bot, method)
+    per_call = (time.perf_counter() - start) / N * 1e6
+    print(f"{label:<28} {per_call:8.1f} µs/reply")
+    return per_call
+
+
+def main() -> None:
+    before = _run("rebuild + serialize", AiohttpSession(), make_main_kb)
+    after = _run("frozen + cached JSON", CachedMarkupSession(), MAIN_KB.__getitem__)
+    print(f"speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
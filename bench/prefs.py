@@ -0,0 +1,52 @@
+# bench/prefs.py
+"""Сховище мов користувачів: швидкість lang_of та час завантаження при старті.
+
+Запуск з кореня репозиторію:  python -m bench.prefs [кількість користувачів]
+"""
+import asyncio
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from prefs import PrefStore, SqlitePrefsBackend
+
+LANGS = ("ru", "ka", "en")
+
+
+async def main(users: int) -> None:
+    path = Path(tempfile.mkdtemp()) / "prefs.sqlite3"
+
+    store = PrefStore(default="ru", backend=SqlitePrefsBackend(path))
+    await store.load()
+    start = time.perf_counter()
+    for uid in range(users):
+        store.set(uid, random.choice(LANGS))
+    await store.flush()
+    print(f"write-behind flush of {users} users: {time.perf_counter() - start:.2f} s")
+    await store.stop()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    store = PrefStore(default="ru", backend=SqlitePrefsBackend(path))
+    await store.load()
+    load_time = time.perf_counter() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"startup load: {load_time * 1000:.0f} ms, {len(store)} non-default entries, "
+          f"{memory / users:.0f} B/user")
+
+    uids = [random.randrange(users * 2) for _ in range(1_000_000)]  # половина — невідомі
+    get = store.get
+    start = time.perf_counter()
+    for uid in uids:
+        get(uid)
+    elapsed = time.perf_counter() - start
+    print(f"lookups: {len(uids) / elapsed / 1e6:.1f} M/s")
+    await store.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 300_000))
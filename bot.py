@@ -1,5 +1,4 @@
 # bot.py
-import json
 import os
 from pathlib import Path
 from typing import Dict, Any
@@ -11,16 +10,26 @@ from aiogram.types import (
     ReplyKeyboardMarkup, KeyboardButton,
     InlineKeyboardMarkup, InlineKeyboardButton,
 )
-from aiogram.types.input_file import FSInputFile  # для відправки локальних файлів (aiogram v3)
+
+from config import JsonConfig
+from fastpath import RouteTable
+from markups import freeze
+from media import MediaCache
+from prefs import PrefStore
 
 # ---------- Files & ENV ----------
 BASE_DIR = Path(__file__).parent
-BANNER_PATH = BASE_DIR / "assets" / "banner.png"
+ASSETS_DIR  = BASE_DIR / "assets"
+BANNER_PATH = ASSETS_DIR / "banner.png"
 DATA_JSON   = BASE_DIR / "data.json"
 CHANNEL_URL = os.getenv("CHANNEL_URL")  # напр.: https://t.me/your_channel
 
-# Зберігаємо вибір мови в оперативній пам'яті (скидається при рестарті процесу)
-USER_LANG: Dict[int, str] = {}  # 'ru' | 'ka' | 'en'
+# file_id вже завантажених файлів з assets/ (переживає рестарт; файл кешу відкриває server.py)
+MEDIA = MediaCache(ASSETS_DIR)
+
+# Вибір мови ('ru' | 'ka' | 'en'): читаємо з пам'яті, на диск пишемо у фоні.
+# SQLite спільна для всіх воркерів uvicorn; server.py відкриває/зупиняє сховище.
+PREFS = PrefStore(default="ru")
 
 # ---------- Тексти для RU / KA / EN ----------
 TXT = {
@@ -105,24 +114,23 @@ def norm_lang(code: str) -> str:
     return code if code in ("ru", "ka", "en") else "ru"
 
 def lang_of(uid: int) -> str:
-    return USER_LANG.get(uid, "ru")
+    return PREFS.get(uid)
 
 def set_lang(uid: int, code: str) -> str:
     code = norm_lang(code)
-    USER_LANG[uid] = code
+    PREFS.set(uid, code)
     return code
 
-def read_contacts() -> Dict[str, Any]:
-    """Зчитуємо дані з data.json. Достатньо поля 'phone' (рядок або кілька рядків)."""
-    try:
-        data = json.loads(DATA_JSON.read_text(encoding="utf-8"))
-        if not isinstance(data, dict):
-            raise ValueError
-        return {
-            "phone": data.get("phone", "—"),
-        }
-    except Exception:
-        return {"phone": "—"}
+def render_contacts(data: Dict[str, Any]) -> Dict[str, str]:
+    """Готові тексти "Контакти" для кожної мови. З data.json достатньо поля 'phone'."""
+    phone = data.get("phone", "—")
+    return {
+        lang: f"{t['contacts_title']}\n• {t['contacts_phone']}: {phone}"
+        for lang, t in TXT.items()
+    }
+
+# data.json у пам'яті; server.py запускає watcher, що перечитує файл при зміні
+CONTACTS = JsonConfig(DATA_JSON, render=render_contacts, default={"phone": "—"})
 
 def make_main_kb(lang: str) -> ReplyKeyboardMarkup:
     lang = norm_lang(lang)
@@ -147,43 +155,62 @@ def make_lang_choice_kb() -> InlineKeyboardMarkup:
         ]]
     )
 
+def make_channel_kb(lang: str) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(
+        inline_keyboard=[[InlineKeyboardButton(text=TXT[lang]["open_channel_btn"], url=CHANNEL_URL)]]
+    )
+
+# Готові клавіатури: збираються один раз, хендлери лише беруть їх зі словника.
+# freeze() дозволяє CachedMarkupSession серіалізувати кожну з них лише раз.
+MAIN_KB = {lang: freeze(make_main_kb(lang)) for lang in TXT}
+LANG_CHOICE_KB = freeze(make_lang_choice_kb())
+CHANNEL_KB = {lang: freeze(make_channel_kb(lang)) for lang in TXT} if CHANNEL_URL else {}
+
+# Усе, на що є хендлер нижче; server.py відкидає інші апдейти ще до pydantic.
+# Додаючи хендлер — додайте і його текст/команду/префікс сюди.
+ROUTES = RouteTable(
+    texts=(label for by_lang in LABELS.values() for label in by_lang.values()),
+    commands=("start", "ping"),
+    callback_prefixes=("setlang:",),
+)
+
 router = Router()
 
 # ---------- Handlers ----------
+# Хендлер може повернути один метод (message.answer(...) без await) замість
+# виклику: server.py відправить його у відповіді на вебхук або звичайним запитом.
 
 @router.message(CommandStart())
 async def on_start(message: Message):
     uid = message.from_user.id
     lang = lang_of(uid)
-    kb = make_main_kb(lang)
+    kb = MAIN_KB[lang]
 
     # Банер + клавіатура в одному повідомленні
     if BANNER_PATH.exists():
-        photo = FSInputFile(str(BANNER_PATH))
-        await message.answer_photo(photo=photo, caption=TXT[lang]["start_caption"], reply_markup=kb)
+        await MEDIA.send(
+            BANNER_PATH.name,
+            lambda photo: message.answer_photo(photo=photo, caption=TXT[lang]["start_caption"], reply_markup=kb),
+        )
     else:
-        await message.answer(TXT[lang]["start_caption"], reply_markup=kb)
+        return message.answer(TXT[lang]["start_caption"], reply_markup=kb)
 
 @router.message(Command("ping"))
 async def on_ping(message: Message):
-    await message.answer("pong")
+    return message.answer("pong")
 
 @router.message(F.text.in_({LABELS["contacts"]["ru"], LABELS["contacts"]["ka"], LABELS["contacts"]["en"]}))
 async def on_contacts(message: Message):
     """Показуємо лише телефони з data.json (без email та адреси)."""
     uid = message.from_user.id
     lang = lang_of(uid)
-    t = TXT[lang]
-    c = read_contacts()
-
-    text = f"{t['contacts_title']}\n• {t['contacts_phone']}: {c['phone']}"
-    await message.answer(text, reply_markup=make_main_kb(lang))
+    return message.answer(CONTACTS.current[lang], reply_markup=MAIN_KB[lang])
 
 @router.message(F.text.in_({LABELS["lang"]["ru"], LABELS["lang"]["ka"], LABELS["lang"]["en"]}))
 async def on_change_lang(message: Message):
     uid = message.from_user.id
     lang = lang_of(uid)
-    await message.answer(TXT[lang]["lang_prompt"], reply_markup=make_lang_choice_kb())
+    return message.answer(TXT[lang]["lang_prompt"], reply_markup=LANG_CHOICE_KB)
 
 @router.callback_query(F.data.startswith("setlang:"))
 async def on_set_lang(call: CallbackQuery):
@@ -191,19 +218,15 @@ async def on_set_lang(call: CallbackQuery):
     _, code = call.data.split(":", 1)
     new_lang = set_lang(uid, code)
 
-    await call.message.answer(TXT[new_lang]["lang_set"], reply_markup=make_main_kb(new_lang))
-    await call.answer()
+    await call.message.answer(TXT[new_lang]["lang_set"], reply_markup=MAIN_KB[new_lang])
+    return call.answer()
 
 @router.message(F.text.in_({LABELS["back_channel"]["ru"], LABELS["back_channel"]["ka"], LABELS["back_channel"]["en"]}))
 async def on_back_channel(message: Message):
     lang = lang_of(message.from_user.id)
     if CHANNEL_URL:
-        kb = InlineKeyboardMarkup(
-            inline_keyboard=[[InlineKeyboardButton(text=TXT[lang]["open_channel_btn"], url=CHANNEL_URL)]]
-        )
-        await message.answer(TXT[lang]["open_channel_text"], reply_markup=kb)
-    else:
-        await message.answer(TXT[lang]["no_channel"], reply_markup=make_main_kb(lang))
+        return message.answer(TXT[lang]["open_channel_text"], reply_markup=CHANNEL_KB[lang])
+    return message.answer(TXT[lang]["no_channel"], reply_markup=MAIN_KB[lang])
 
 # Інші повідомлення — повна тиша
 @router.message()
@@ -0,0 +1,86 @@
+# config.py
+import asyncio
+import json
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, Generic, Optional, Tuple, TypeVar
+
+log = logging.getLogger("config")
+
+T = TypeVar("T")
+
+# (mtime_ns, size, inode) — достатньо, щоб помітити зміну чи заміну файлу
+_Stamp = Tuple[int, int, int]
+
+
+def _stamp(path: Path) -> Optional[_Stamp]:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+class JsonConfig(Generic[T]):
+    """JSON-файл, розібраний і відрендерений заздалегідь, з гарячим перезавантаженням.
+
+    `render` перетворює dict з файлу на готове значення (напр. тексти відповідей),
+    тож хендлери читають лише `current` — без диску й json на гарячому шляху.
+    Watcher опитує stat у потоці; при помилці розбору лишається остання вдала версія.
+    """
+
+    def __init__(self, path: Path, render: Callable[[Dict[str, Any]], T], default: Dict[str, Any]):
+        self.path = path
+        self.render = render
+        self.current: T = render(default)
+        self._stamp: Optional[_Stamp] = None
+        self._task: Optional[asyncio.Task] = None
+        # Перше завантаження синхронне: відбувається при імпорті, до старту event loop
+        self._apply(self._read())
+
+    def _read(self) -> Optional[Tuple[_Stamp, T]]:
+        stamp = _stamp(self.path)
+        if stamp is None or stamp == self._stamp:
+            return None
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if not isinstance(data, dict):
+                raise ValueError("top-level value must be an object")
+            return stamp, self.render(data)
+        except Exception as e:
+            log.error("Failed to load %s, keeping previous version: %s", self.path, e)
+            # Запам'ятовуємо stamp, щоб не повторювати помилку кожен цикл
+            self._stamp = stamp
+            return None
+
+    def _apply(self, loaded: Optional[Tuple[_Stamp, T]]) -> bool:
+        if loaded is None:
+            return False
+        # Одне присвоєння — хендлери бачать або стару, або нову версію цілком
+        self._stamp, self.current = loaded
+        return True
+
+    async def reload(self) -> bool:
+        return self._apply(await asyncio.to_thread(self._read))
+
+    async def _watch(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if await self.reload():
+                    log.info("Reloaded %s", self.path)
+            except Exception as e:
+                log.exception("Config watcher error for %s: %s", self.path, e)
+
+    def start(self, interval: float) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._watch(interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,36 @@
+# dedup.py
+from array import array
+from typing import Set
+
+
+class UpdateWindow:
+    """Останні `capacity` update_id: кільцевий буфер фіксованого розміру + множина.
+
+    Telegram повторно надсилає апдейт, якщо вебхук відповів повільно чи сервіс
+    перезапускався; такі повтори впізнаємо тут і не передаємо в диспетчер.
+    `capacity` 0 вимикає перевірку.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 0:
+            raise ValueError(f"capacity must be >= 0, got {capacity}")
+        self.capacity = capacity
+        self.dropped = 0
+        self._ring = array("q", [-1]) * capacity
+        self._pos = 0
+        self._ids: Set[int] = set()
+
+    def seen(self, update_id: int) -> bool:
+        """True, якщо апдейт уже був (і рахуємо його як відкинутий), інакше запам'ятовуємо."""
+        if not self.capacity:
+            return False
+        if update_id in self._ids:
+            self.dropped += 1
+            return True
+        old = self._ring[self._pos]
+        if old != -1:
+            self._ids.discard(old)
+        self._ring[self._pos] = update_id
+        self._ids.add(update_id)
+        self._pos = (self._pos + 1) % self.capacity
+        return False
@@ -0,0 +1,52 @@
+# fastpath.py
+from typing import Any, Iterable, Tuple
+
+try:
+    from orjson import loads
+except ImportError:  # orjson — необов'язковий прискорювач
+    from json import loads
+
+
+class RouteTable:
+    """Попередній фільтр сирих апдейтів — до побудови pydantic-об'єктів.
+
+    Пропускаємо лише те, на що є хендлер: точний текст кнопки, команду
+    або callback_data з відомим префіксом. Решта (спам, балачки) відкидається
+    одразу, бо в роутері вона все одно дійшла б до мовчазного `_noop`.
+    """
+
+    def __init__(self, texts: Iterable[str], commands: Iterable[str], callback_prefixes: Tuple[str, ...]):
+        self.texts = frozenset(texts)
+        self.commands = frozenset(commands)
+        self.callback_prefixes = callback_prefixes
+
+    def accepts(self, data: Any) -> bool:
+        """False — апдейт точно нікому не потрібен. Тіла незвичної форми пропускаємо:
+        хай їх відхилить валідація Update, як і без фільтра."""
+        if not isinstance(data, dict):
+            return True
+
+        message = data.get("message")
+        if message is not None:
+            if not isinstance(message, dict):
+                return True
+            text = message.get("text")
+            if isinstance(text, str) and text in self.texts:
+                return True
+            # Як фільтр Command в aiogram: команда може бути й у підписі до фото
+            command = text or message.get("caption")
+            if isinstance(command, str) and command.startswith("/"):
+                # "/start", "/start payload", "/start@bot_name"
+                parts = command[1:].split(maxsplit=1)  # "/ " -> []
+                name = parts[0] if parts else ""
+                return name.split("@", 1)[0] in self.commands
+            return False
+
+        call = data.get("callback_query")
+        if call is not None:
+            if not isinstance(call, dict):
+                return True
+            payload = call.get("data")
+            return isinstance(payload, str) and payload.startswith(self.callback_prefixes)
+
+        return False
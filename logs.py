@@ -0,0 +1,136 @@
+# logs.py
+import hashlib
+import logging
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+from urllib.parse import quote
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from pool import chat_key
+
+_listener: Optional[QueueListener] = None
+
+
+class RedactingQueueHandler(QueueHandler):
+    """Форматуємо запис у потоці, що логує, прибираємо секрети і кладемо в чергу.
+
+    Сам запис у stderr робить фоновий потік QueueListener, тож event loop
+    ніколи не блокується на I/O.
+    """
+
+    def __init__(self, q: "queue.SimpleQueue[Any]", secrets: Iterable[str]):
+        super().__init__(q)
+        # У шляхах (access log uvicorn) токен трапляється з ":" -> "%3A"
+        self.secrets = tuple({v for s in secrets if s for v in (s, quote(s, safe=""))})
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = super().prepare(record)
+        for secret in self.secrets:
+            if secret in record.msg:
+                record.msg = record.message = record.msg.replace(secret, "***")
+        return record
+
+
+def setup_logging(level: str, secrets: Iterable[str] = ()) -> None:
+    """Замість logging.basicConfig: кореневий логер пише через чергу."""
+    global _listener
+    if _listener is not None:
+        return
+    q: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+    handler = RedactingQueueHandler(q, secrets)
+    handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level)
+    # uvicorn ставить власні StreamHandler ще до імпорту застосунку; його access log
+    # містить шлях вебхука з токеном — переводимо ці логери на ту саму чергу
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        logger = logging.getLogger(name)
+        logger.handlers[:] = []
+        logger.propagate = True
+    # aiogram пише рядок на кожен апдейт — його замінює UpdateLog
+    logging.getLogger("aiogram.event").setLevel(logging.WARNING)
+    _listener = QueueListener(q, logging.StreamHandler(sys.stderr))
+    _listener.start()
+
+
+def stop_logging() -> None:
+    """Дописуємо все, що лишилось у черзі (викликати при зупинці)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def parse_rates(spec: str) -> Dict[str, float]:
+    """"message=0.1,callback_query=1,*=1" -> {"message": 0.1, ...}"""
+    rates: Dict[str, float] = {}
+    for part in spec.split(","):
+        if "=" in part:
+            key, value = part.split("=", 1)
+            rates[key.strip()] = float(value)
+    return rates
+
+
+def redact_key(secret: str) -> bytes:
+    """Ключ для _mask із довільного секрету (blake2s приймає ключ до 32 байт)."""
+    return hashlib.blake2s(secret.encode(), person=b"logmask").digest()
+
+
+def _mask(value: Any, key: bytes) -> str:
+    # Короткий хеш: у логах можна зіставити записи одного чату, але не побачити id.
+    # Без ключа id чатів (невеликий простір чисел) легко перебрати.
+    return hashlib.blake2s(str(value).encode(), key=key, digest_size=4).hexdigest()
+
+
+class UpdateLog:
+    """Один компактний рядок на апдейт замість повного payload.
+
+    Частка записів задається окремо для кожного типу апдейта ("*" — решта),
+    поля з `redact` замінюються хешем з ключем `key` (див. redact_key).
+    """
+
+    def __init__(self, logger: logging.Logger, rates: Dict[str, float], redact: Iterable[str], key: bytes):
+        self.logger = logger
+        self.rates = rates
+        self.default_rate = rates.get("*", 1.0)
+        self.redact = frozenset(redact)
+        self.key = key
+
+    def record(self, update: Update, handler: Optional[str], seconds: float) -> None:
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        kind = update.event_type
+        if random.random() >= self.rates.get(kind, self.default_rate):
+            return
+        fields: Dict[str, Any] = {
+            "id": update.update_id,
+            "type": kind,
+            "chat": chat_key(update),
+            "handler": handler or "-",
+            "ms": f"{seconds * 1000:.1f}",
+        }
+        for name in self.redact:
+            if name in fields:
+                fields[name] = _mask(fields[name], self.key)
+        self.logger.info("update %s", " ".join(f"{k}={v}" for k, v in fields.items()))
+
+
+class HandlerNameMiddleware(BaseMiddleware):
+    """Записує назву хендлера в data["trace"], щоб UpdateLog міг її показати."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        trace = data.get("trace")
+        if trace is not None:
+            trace["handler"] = data["handler"].callback.__name__
+        return await handler(event, data)
@@ -0,0 +1,58 @@
+# markups.py
+from typing import Any, Dict, TypeVar
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.methods import TelegramMethod
+from aiohttp import FormData
+
+M = TypeVar("M")
+
+# Спільні клавіатури, ключовані за id(); тримаємо посилання, щоб id не перевикористався
+_FROZEN: Dict[int, Any] = {}
+
+
+def freeze(markup: M) -> M:
+    """Реєструємо спільну клавіатуру: її JSON сесія обчислить один раз і перевикористає.
+
+    Кеш ключується ідентичністю об'єкта, тож реєструвати варто лише клавіатури,
+    зібрані один раз на рівні модуля.
+    """
+    _FROZEN[id(markup)] = markup
+    return markup
+
+
+class CachedMarkupSession(AiohttpSession):
+    """Сесія, яка серіалізує зареєстровані клавіатури в JSON лише раз."""
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._serialized: Dict[int, str] = {}
+        self._values: Dict[int, Any] = {}
+
+    def serialized_markup(self, bot: Bot, markup: Any) -> Any:
+        """JSON-рядок для form-data; None, якщо клавіатуру не зареєстровано."""
+        if id(markup) not in _FROZEN:
+            return None
+        raw = self._serialized.get(id(markup))
+        if raw is None:
+            raw = self._serialized[id(markup)] = self.prepare_value(markup, bot=bot, files={})
+        return raw
+
+    def markup_value(self, bot: Bot, markup: Any) -> Any:
+        """Те саме, але як dict — для тіла відповіді вебхука."""
+        if id(markup) not in _FROZEN:
+            return None
+        value = self._values.get(id(markup))
+        if value is None:
+            value = self._values[id(markup)] = self.prepare_value(markup, bot=bot, files={}, _dumps_json=False)
+        return value
+
+    def build_form_data(self, bot: Bot, method: TelegramMethod[Any]) -> FormData:
+        markup = getattr(method, "reply_markup", None)
+        raw = self.serialized_markup(bot, markup) if markup is not None else None
+        if raw is None:
+            return super().build_form_data(bot, method)
+        form = super().build_form_data(bot, method.model_copy(update={"reply_markup": None}))
+        form.add_field("reply_markup", raw)
+        return form
@@ -0,0 +1,152 @@
+# media.py
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import Message
+from aiogram.types.input_file import FSInputFile
+
+log = logging.getLogger("media")
+
+# Поля Message, в яких Telegram повертає file_id завантаженого файлу
+_MEDIA_FIELDS = ("photo", "animation", "video", "document", "audio", "voice", "sticker")
+
+
+# Фрагменти опису TelegramBadRequest, що стосуються саме file_id
+_FILE_ID_ERRORS = ("wrong file identifier", "file reference", "wrong remote file identifier", "file_id")
+
+
+def _is_file_id_error(error: TelegramBadRequest) -> bool:
+    message = error.message.lower()
+    return any(fragment in message for fragment in _FILE_ID_ERRORS)
+
+
+def _file_id_of(message: Message) -> Optional[str]:
+    for field in _MEDIA_FIELDS:
+        media = getattr(message, field, None)
+        if not media:
+            continue
+        if isinstance(media, list):  # photo — список розмірів, найбільший останній
+            media = media[-1]
+        return media.file_id
+    return None
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class MediaCache:
+    """Кеш file_id для файлів з assets/: завантажуємо один раз, далі шлемо за file_id.
+
+    Записи ключуються відносним шляхом і sha256 вмісту; (mtime_ns, size) лише
+    підказують, коли треба перерахувати хеш. Кеш зберігається в JSON між рестартами.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        # Файл кешу задає server.py через open() — після load_dotenv()
+        self.store: Optional[Path] = None
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def open(self, store: Path) -> None:
+        self.store = store
+        self._entries = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            data = json.loads(self.store.read_text(encoding="utf-8"))
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            log.warning("Media cache %s is unreadable, starting empty: %s", self.store, e)
+            return {}
+
+    def _save(self) -> None:
+        if self.store is None:
+            return
+        # Свій тимчасовий файл на кожен запис: воркери uvicorn пишуть кеш одночасно
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=self.store.parent, prefix=self.store.name + ".", suffix=".tmp", delete=False
+        ) as f:
+            json.dump(self._entries, f, ensure_ascii=False, indent=2)
+        try:
+            os.replace(f.name, self.store)
+        except BaseException:
+            os.unlink(f.name)
+            raise
+
+    def _fresh_entry(self, name: str, st: os.stat_result) -> Optional[Dict[str, Any]]:
+        """Запис, що відповідає поточному файлу за stat, або None."""
+        entry = self._entries.get(name)
+        if entry and entry.get("mtime_ns") == st.st_mtime_ns and entry.get("size") == st.st_size:
+            return entry
+        return None
+
+    async def _revalidate(self, name: str, path: Path, st: os.stat_result) -> Optional[Dict[str, Any]]:
+        """stat змінився — звіряємо хеш вмісту (touch без змін не скидає file_id)."""
+        digest = await asyncio.to_thread(_sha256, path)
+        entry = self._entries.get(name)
+        if entry and entry.get("sha256") == digest:
+            entry["mtime_ns"], entry["size"] = st.st_mtime_ns, st.st_size
+            await asyncio.to_thread(self._save)
+            return entry
+        self._entries[name] = {"sha256": digest, "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+        return None
+
+    async def _remember(self, name: str, message: Message) -> None:
+        file_id = _file_id_of(message)
+        entry = self._entries.get(name)
+        if not file_id or entry is None or entry.get("file_id") == file_id:
+            return
+        entry["file_id"] = file_id
+        await asyncio.to_thread(self._save)
+        log.info("Cached file_id for %s", name)
+
+    def invalidate(self, name: str) -> None:
+        entry = self._entries.get(name)
+        if entry:
+            entry.pop("file_id", None)
+
+    async def send(
+        self,
+        name: str,
+        send: Callable[[Union[str, FSInputFile]], Awaitable[Message]],
+    ) -> Message:
+        """Надсилаємо assets/<name> через send(media): file_id з кешу або upload."""
+        path = self.root / name
+        st = path.stat()
+        entry = self._fresh_entry(name, st)
+        if entry and entry.get("file_id"):
+            try:
+                return await send(entry["file_id"])
+            except TelegramBadRequest as e:
+                # Інші помилки (чат не знайдено, задовгий підпис) до file_id не стосуються
+                if not _is_file_id_error(e):
+                    raise
+                # file_id міг протухнути (інший бот/токен) — перезавантажуємо файл
+                log.warning("Cached file_id for %s rejected (%s), re-uploading", name, e)
+                self.invalidate(name)
+
+        # Одночасні /start не повинні вантажити той самий файл кілька разів
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            st = path.stat()
+            entry = self._fresh_entry(name, st) or await self._revalidate(name, path, st)
+            if entry and entry.get("file_id"):
+                return await send(entry["file_id"])
+            message = await send(FSInputFile(str(path)))
+            await self._remember(name, message)
+            return message
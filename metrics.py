@@ -0,0 +1,172 @@
+# metrics.py
+import time
+from bisect import bisect_left
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from aiogram import BaseMiddleware, Bot, Dispatcher
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import Response, TelegramMethod
+from aiogram.types import TelegramObject, Update
+
+# Межі кошиків гістограм, секунди
+BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    __slots__ = ("counts", "sum")
+
+    def __init__(self) -> None:
+        # Останній кошик — +Inf. Масив виділяється один раз, далі лише інкременти.
+        self.counts: List[int] = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+
+
+class Family:
+    """Метрика з однією міткою (handler, method, type ...).
+
+    Усе виконується в одному event loop, тож прості int без блокувань безпечні.
+    """
+
+    def __init__(self, name: str, help: str, kind: str, label: str):
+        self.name = name
+        self.help = help
+        self.kind = kind  # counter | gauge | histogram
+        self.label = label
+        self.values: Dict[str, Any] = {}
+
+    def inc(self, key: str, amount: int = 1) -> None:
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def observe(self, key: str, value: float) -> None:
+        hist = self.values.get(key)
+        if hist is None:
+            hist = self.values[key] = Histogram()
+        hist.observe(value)
+
+    def render(self, out: List[str]) -> None:
+        out.append(f"# HELP {self.name} {self.help}")
+        out.append(f"# TYPE {self.name} {self.kind}")
+        for key, value in self.values.items():
+            label = f'{self.label}="{key}"'
+            if self.kind != "histogram":
+                out.append(f"{self.name}{{{label}}} {value}")
+                continue
+            total = 0
+            for bound, count in zip(BUCKETS + (float("inf"),), value.counts):
+                total += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                out.append(f'{self.name}_bucket{{{label},le="{le}"}} {total}')
+            out.append(f"{self.name}_sum{{{label}}} {value.sum}")
+            out.append(f"{self.name}_count{{{label}}} {total}")
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self.families: List[Family] = []
+        # Значення, які читаються в момент скрейпу (глибина черги тощо)
+        self.gauges: List[Tuple[str, str, Callable[[], float]]] = []
+
+    def family(self, name: str, help: str, kind: str, label: str) -> Family:
+        family = Family(name, help, kind, label)
+        self.families.append(family)
+        return family
+
+    def gauge(self, name: str, help: str, read: Callable[[], float]) -> None:
+        self.gauges.append((name, help, read))
+
+    def render(self) -> str:
+        out: List[str] = []
+        for family in self.families:
+            family.render(out)
+        for name, help, read in self.gauges:
+            out.append(f"# HELP {name} {help}")
+            out.append(f"# TYPE {name} gauge")
+            out.append(f"{name} {read()}")
+        return "\n".join(out) + "\n"
+
+
+METRICS = Metrics()
+
+updates_total = METRICS.family("bot_updates_total", "Updates received by type.", "counter", "type")
+update_seconds = METRICS.family("bot_update_seconds", "Time in dp.feed_update by update type.", "histogram", "type")
+handler_seconds = METRICS.family("bot_handler_seconds", "Handler latency.", "histogram", "handler")
+handler_in_flight = METRICS.family("bot_handler_in_flight", "Handlers currently running.", "gauge", "handler")
+handler_errors = METRICS.family("bot_handler_errors_total", "Handlers that raised.", "counter", "handler")
+api_seconds = METRICS.family("bot_api_seconds", "Outbound Bot API call latency.", "histogram", "method")
+api_in_flight = METRICS.family("bot_api_in_flight", "Bot API calls in progress.", "gauge", "method")
+api_errors = METRICS.family("bot_api_errors_total", "Bot API calls that failed.", "counter", "method")
+webhook_skipped = METRICS.family("bot_webhook_skipped_total", "Updates acknowledged without dispatch.", "counter", "reason")
+
+
+class UpdateMetricsMiddleware(BaseMiddleware):
+    """Outer middleware на dp.update: весь шлях апдейта через диспетчер."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any],
+    ) -> Any:
+        kind = event.event_type
+        updates_total.inc(kind)
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            update_seconds.observe(kind, time.perf_counter() - start)
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Inner middleware: спрацьовує лише для хендлера, чиї фільтри пройшли."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        name = data["handler"].callback.__name__
+        handler_in_flight.inc(name)
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            handler_errors.inc(name)
+            raise
+        finally:
+            handler_seconds.observe(name, time.perf_counter() - start)
+            handler_in_flight.inc(name, -1)
+
+
+class ApiMetricsMiddleware(BaseRequestMiddleware):
+    """Middleware сесії бота: час кожного вихідного виклику Bot API."""
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[Any],
+        bot: Bot,
+        method: TelegramMethod[Any],
+    ) -> Response[Any]:
+        name = method.__api_method__
+        api_in_flight.inc(name)
+        start = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception:
+            api_errors.inc(name)
+            raise
+        finally:
+            api_seconds.observe(name, time.perf_counter() - start)
+            api_in_flight.inc(name, -1)
+
+
+def instrument(dp: Dispatcher, bot: Bot) -> None:
+    dp.update.outer_middleware(UpdateMetricsMiddleware())
+    # Inner middleware диспетчера діють і на вкладені роутери
+    dp.message.middleware(HandlerMetricsMiddleware())
+    dp.callback_query.middleware(HandlerMetricsMiddleware())
+    bot.session.middleware(ApiMetricsMiddleware())
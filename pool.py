@@ -0,0 +1,73 @@
+# pool.py
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List
+
+from aiogram.types import Update
+
+log = logging.getLogger("pool")
+
+
+def chat_key(update: Update) -> int:
+    """Ключ впорядкування: апдейти одного чату завжди йдуть в одну чергу."""
+    if update.message is not None:
+        return update.message.chat.id
+    call = update.callback_query
+    if call is not None:
+        if call.message is not None:
+            return call.message.chat.id
+        return call.from_user.id
+    return update.update_id
+
+
+class UpdatePool:
+    """Фонова обробка апдейтів: N воркерів, у кожного своя обмежена черга.
+
+    Апдейт потрапляє у чергу воркера за chat_key, тож порядок у межах чату
+    зберігається, а різні чати обробляються паралельно. Коли черга повна,
+    put() чекає — так тиск передається назад на вебхук.
+    """
+
+    def __init__(self, process: Callable[[Update], Awaitable[Any]], workers: int, maxsize: int):
+        if workers < 1:
+            raise ValueError(f"workers must be >= 1, got {workers}")
+        self.process = process
+        per_worker = max(1, maxsize // workers)
+        self._queues: List[asyncio.Queue] = [asyncio.Queue(maxsize=per_worker) for _ in range(workers)]
+        self._tasks: List[asyncio.Task] = []
+        self._closed = False
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker(q)) for q in self._queues]
+
+    def qsize(self) -> int:
+        return sum(q.qsize() for q in self._queues)
+
+    async def put(self, update: Update) -> None:
+        if self._closed:
+            raise RuntimeError("update pool is shutting down")
+        queue = self._queues[chat_key(update) % len(self._queues)]
+        await queue.put(update)
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            update: Update = await queue.get()
+            try:
+                await self.process(update)
+            except Exception as e:
+                log.exception("Error while processing update %s: %s", update.update_id, e)
+            finally:
+                queue.task_done()
+
+    async def stop(self, timeout: float = 25.0) -> None:
+        """Нові апдейти не приймаємо, чекаємо, поки черги спорожніють, і зупиняємо воркерів."""
+        self._closed = True
+        try:
+            await asyncio.wait_for(asyncio.gather(*(q.join() for q in self._queues)), timeout)
+        except asyncio.TimeoutError:
+            log.warning("Update pool drain timed out, %d updates dropped", self.qsize())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
@@ -0,0 +1,217 @@
+# prefs.py
+import asyncio
+import logging
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Protocol, Tuple
+
+log = logging.getLogger("prefs")
+
+Rows = List[Tuple[int, str]]
+
+
+class PrefsBackend(Protocol):
+    """Довговічне сховище налаштувань. Усі методи блокуючі — викликаються з потоку."""
+
+    def load(self) -> Tuple[Rows, int]: ...
+    def write(self, items: Dict[int, str]) -> None: ...
+    def changes(self, since: int) -> Tuple[Rows, int]: ...
+    def close(self) -> None: ...
+
+
+class SqlitePrefsBackend:
+    """SQLite у режимі WAL. Кожен запис отримує зростаючий seq, тож інші процеси
+    дочитують лише зміни після свого останнього seq."""
+
+    def __init__(self, path: Path):
+        self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS prefs ("
+            " uid INTEGER PRIMARY KEY, value TEXT NOT NULL, seq INTEGER NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS prefs_seq ON prefs(seq)")
+
+    def load(self) -> Tuple[Rows, int]:
+        with self._lock:
+            # Один знімок WAL для обох запитів: запис іншого процесу між ними
+            # інакше потрапив би в seq, але не в rows, і poll() його б пропустив
+            self._db.execute("BEGIN")
+            try:
+                rows = self._db.execute("SELECT uid, value FROM prefs").fetchall()
+                seq = self._db.execute("SELECT COALESCE(MAX(seq), 0) FROM prefs").fetchone()[0]
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return rows, seq
+
+    def write(self, items: Dict[int, str]) -> None:
+        with self._lock:
+            # IMMEDIATE — одразу беремо блокування на запис, щоб seq між процесами не перетинались
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                seq = self._db.execute("SELECT COALESCE(MAX(seq), 0) FROM prefs").fetchone()[0]
+                self._db.executemany(
+                    "INSERT INTO prefs(uid, value, seq) VALUES (?, ?, ?)"
+                    " ON CONFLICT(uid) DO UPDATE SET value = excluded.value, seq = excluded.seq",
+                    [(uid, value, seq + i) for i, (uid, value) in enumerate(items.items(), 1)],
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def changes(self, since: int) -> Tuple[Rows, int]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT uid, value, seq FROM prefs WHERE seq > ? ORDER BY seq", (since,)
+            ).fetchall()
+        if not rows:
+            return [], since
+        return [(uid, value) for uid, value, _ in rows], rows[-1][2]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class PrefStore:
+    """Налаштування користувачів: повна копія в пам'яті перед довговічним бекендом.
+
+    get() — лише пошук у dict. Значення за замовчуванням не зберігаються в пам'яті,
+    тож dict містить тільки тих, хто щось змінив. set() пише у dict одразу, а на диск —
+    пакетом у фоні (write-behind). Зміни інших процесів дочитуються опитуванням.
+
+    Бекенд можна передати одразу або фабрикою в start(): тоді він відкривається
+    лише при старті, і імпорт модуля з PrefStore не створює файлів.
+    """
+
+    def __init__(self, default: str, backend: Optional[PrefsBackend] = None):
+        self.backend = backend
+        self.default = default
+        self._open_backend: Optional[Callable[[], PrefsBackend]] = None
+        self._loaded = False
+        self._cache: Dict[int, str] = {}
+        self._pending: Dict[int, str] = {}
+        self._inflight: Dict[int, str] = {}
+        self._seq = 0
+        self._task: Optional[asyncio.Task] = None
+        self._current: Optional["asyncio.Future[None]"] = None
+
+    def get(self, uid: int) -> str:
+        return self._cache.get(uid, self.default)
+
+    def set(self, uid: int, value: str) -> None:
+        self._remember(uid, value)
+        self._pending[uid] = value
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def _remember(self, uid: int, value: str) -> None:
+        if value == self.default:
+            self._cache.pop(uid, None)
+        else:
+            self._cache[uid] = value
+
+    def _apply(self, rows: Rows) -> None:
+        for uid, value in rows:
+            # Локальний незаписаний вибір новіший за те, що лежить у базі
+            if uid not in self._pending and uid not in self._inflight:
+                # intern — сотні тисяч записів ділять кілька об'єктів-рядків
+                self._remember(uid, sys.intern(value))
+
+    def _read_all(self) -> Tuple[Dict[int, str], int]:
+        # Будуємо dict у потоці, щоб сирі рядки з бази не пережили завантаження
+        rows, seq = self.backend.load()
+        cache = {uid: sys.intern(value) for uid, value in rows if value != self.default}
+        return cache, seq
+
+    async def load(self) -> None:
+        if self.backend is None:
+            self.backend = await asyncio.to_thread(self._open_backend)
+        cache, self._seq = await asyncio.to_thread(self._read_all)
+        self._cache = cache
+        for uid, value in self._pending.items():
+            self._remember(uid, value)
+        self._loaded = True
+        log.info("Loaded %d user preferences", len(self._cache))
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        self._inflight = batch
+        try:
+            await asyncio.to_thread(self.backend.write, batch)
+        except Exception:
+            # Повертаємо пакет назад, не перетираючи новіші зміни
+            self._pending = {**batch, **self._pending}
+            raise
+        finally:
+            self._inflight = {}
+
+    async def poll(self) -> None:
+        rows, self._seq = await asyncio.to_thread(self.backend.changes, self._seq)
+        self._apply(rows)
+
+    async def _step(self, step: Callable[[], Awaitable[None]]) -> None:
+        # shield — stop() не перериває крок посередині, а дочікується його
+        self._current = asyncio.ensure_future(step())
+        try:
+            await asyncio.shield(self._current)
+        except Exception as e:
+            log.exception("Preference store %s failed: %s", step.__name__, e)
+
+    async def _loop(self, flush_interval: float, poll_interval: float) -> None:
+        # flush і poll по черзі в одній задачі: якщо flush завершиться, поки poll
+        # читає базу, _apply вже не бачить ключ у _inflight і старе значення
+        # іншого воркера перетирає свіжіший локальний вибір
+        clock = asyncio.get_running_loop().time
+        next_flush, next_poll = clock() + flush_interval, clock() + poll_interval
+        while True:
+            await asyncio.sleep(max(0.0, min(next_flush, next_poll) - clock()))
+            if not self._loaded:
+                # Старт пройшов без бази — пробуємо знову; вибір мови поки лише в пам'яті
+                await self._step(self.load)
+                if not self._loaded:
+                    next_flush, next_poll = clock() + flush_interval, clock() + poll_interval
+                    continue
+            if clock() >= next_flush:
+                await self._step(self.flush)
+                next_flush = clock() + flush_interval
+            if clock() >= next_poll:
+                await self._step(self.poll)
+                next_poll = clock() + poll_interval
+
+    async def start(
+        self, open_backend: Callable[[], PrefsBackend], flush_interval: float, poll_interval: float
+    ) -> None:
+        self._open_backend = open_backend
+        try:
+            await self.load()
+        except Exception as e:
+            # Заблокована чи пошкоджена база не валить сервіс: стартуємо з порожнім
+            # кешем (усі бачать мову за замовчуванням), load() повторить фоновий цикл
+            log.exception("Preference store load failed, starting empty: %s", e)
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(flush_interval, poll_interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._current is not None:
+            await asyncio.gather(self._current, return_exceptions=True)
+            self._current = None
+        if self.backend is None:
+            return
+        await self.flush()
+        await asyncio.to_thread(self.backend.close)
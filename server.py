@@ -1,22 +1,39 @@
 # server.py
 import os
 import asyncio
+import fcntl
 import logging
-from typing import Any, Dict
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
 
 from fastapi import FastAPI, Request, HTTPException, Response
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from dotenv import load_dotenv
 
 from aiogram import Bot, Dispatcher
+from aiogram.client.telegram import PRODUCTION, TelegramAPIServer
+from aiogram.methods import TelegramMethod
 from aiogram.types import Update
 
-from bot import router
+from bot import router, CONTACTS, MEDIA, PREFS, ROUTES
+from dedup import UpdateWindow
+from fastpath import loads
+from logs import HandlerNameMiddleware, UpdateLog, parse_rates, redact_key, setup_logging, stop_logging
+from markups import CachedMarkupSession
+from metrics import METRICS, instrument, webhook_skipped
+from pool import UpdatePool
+from prefs import SqlitePrefsBackend
+from snapshot import Snapshot
 
 # ----- ENV -----
 load_dotenv()
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 WEBHOOK_BASE = os.getenv("WEBHOOK_BASE")  # напр.: https://telegram-bot-auto-georgia.onrender.com
+# Інший Bot API сервер (локальний telegram-bot-api або фейковий з bench/fake_api.py)
+TELEGRAM_API_BASE = os.getenv("TELEGRAM_API_BASE")
 
 if not BOT_TOKEN:
     raise RuntimeError("BOT_TOKEN is not set")
@@ -25,16 +42,102 @@ if not WEBHOOK_BASE:
 
 WEBHOOK_PATH = f"/webhook/{BOT_TOKEN}"
 WEBHOOK_URL = f"{WEBHOOK_BASE.rstrip('/')}{WEBHOOK_PATH}"
+ALLOWED_UPDATES = ["message", "callback_query"]
+MAX_CONNECTIONS = 40
+# Лише процес, що захопив цей файл, звіряє/ставить вебхук при старті
+WEBHOOK_LOCK = Path(os.getenv(
+    "WEBHOOK_LOCK", Path(tempfile.gettempdir()) / f"webhook-{BOT_TOKEN.split(':')[0]}.lock"
+))
+
+# Режим "підтвердити й обробити у фоні": вебхук одразу відповідає 200,
+# а апдейти обробляє пул воркерів (див. pool.py)
+WEBHOOK_ASYNC = os.getenv("WEBHOOK_ASYNC", "0") == "1"
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", "8"))
+WEBHOOK_QUEUE_SIZE = int(os.getenv("WEBHOOK_QUEUE_SIZE", "1000"))
+if WEBHOOK_WORKERS < 1:
+    raise RuntimeError(f"WEBHOOK_WORKERS must be >= 1, got {WEBHOOK_WORKERS}")
+# Метод, який повернув хендлер, віддаємо в тілі відповіді на вебхук
+# (без окремого запиту до api.telegram.org). Лише в синхронному режимі.
+WEBHOOK_REPLY_IN_RESPONSE = os.getenv("WEBHOOK_REPLY_IN_RESPONSE", "1") == "1"
+# Де зберігати file_id завантажених файлів з assets/
+MEDIA_CACHE_PATH = Path(os.getenv("MEDIA_CACHE_PATH", Path(__file__).parent / "media_cache.json"))
+# SQLite з вибором мови, спільна для всіх воркерів
+PREFS_DB = Path(os.getenv("PREFS_DB", Path(__file__).parent / "prefs.sqlite3"))
+# Як часто скидати вибір мови на диск і підтягувати зміни інших воркерів (сек)
+PREFS_FLUSH_INTERVAL = float(os.getenv("PREFS_FLUSH_INTERVAL", "1"))
+PREFS_POLL_INTERVAL = float(os.getenv("PREFS_POLL_INTERVAL", "2"))
+# Як часто перевіряти data.json на зміни (сек)
+CONFIG_POLL_INTERVAL = float(os.getenv("CONFIG_POLL_INTERVAL", "5"))
+# Скільки останніх update_id пам'ятаємо, щоб відкидати повторні доставки (0 — вимкнено)
+DEDUP_WINDOW = int(os.getenv("DEDUP_WINDOW", "10000"))
+# Відкидати апдейти без хендлера ще до валідації (див. fastpath.py)
+WEBHOOK_FASTPATH = os.getenv("WEBHOOK_FASTPATH", "1") == "1"
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# Частка апдейтів, що потрапляють у лог, за типом: "message=0.1,callback_query=1,*=1"
+LOG_SAMPLE = os.getenv("LOG_SAMPLE", "*=1")
+# Поля рядка апдейта, які в лозі замінюються хешем (id, type, chat, handler)
+LOG_REDACT = os.getenv("LOG_REDACT", "chat")
+# Секрет для цих хешів; без нього ключ виводиться з токена бота
+LOG_REDACT_KEY = os.getenv("LOG_REDACT_KEY") or BOT_TOKEN
+# GET / віддає збережений get_webhook_info; оновлюємо його у фоні (сек)
+WEBHOOK_INFO_TTL = float(os.getenv("WEBHOOK_INFO_TTL", "60"))
+WEBHOOK_INFO_REFRESH = float(os.getenv("WEBHOOK_INFO_REFRESH", "30"))
 
 # ----- LOGGING -----
-logging.basicConfig(level=logging.INFO)
+# Запис у stderr — у фоновому потоці; токен бота вирізається з усіх повідомлень
+setup_logging(LOG_LEVEL, secrets=[BOT_TOKEN])
 log = logging.getLogger("app")
+update_log = UpdateLog(
+    logging.getLogger("updates"), parse_rates(LOG_SAMPLE), LOG_REDACT.split(","), redact_key(LOG_REDACT_KEY)
+)
 
 # ----- APP/BOT/DP -----
 app = FastAPI()
-bot = Bot(BOT_TOKEN)
+api = TelegramAPIServer.from_base(TELEGRAM_API_BASE) if TELEGRAM_API_BASE else PRODUCTION
+bot = Bot(BOT_TOKEN, session=CachedMarkupSession(api=api))
 dp = Dispatcher()
 dp.include_router(router)
+recent_updates = UpdateWindow(DEDUP_WINDOW)
+instrument(dp, bot)
+dp.message.middleware(HandlerNameMiddleware())
+dp.callback_query.middleware(HandlerNameMiddleware())
+webhook_info = Snapshot(bot.get_webhook_info, ttl=WEBHOOK_INFO_TTL)
+MEDIA.open(MEDIA_CACHE_PATH)
+
+async def _process_update(update: Update, reply_in_response: bool = False) -> Optional[TelegramMethod]:
+    """Обробляємо апдейт. Метод, повернутий хендлером, виконуємо самі
+    або (reply_in_response) віддаємо назад, щоб відправити у відповіді вебхука."""
+    trace: Dict[str, str] = {}
+    start = time.perf_counter()
+    try:
+        result = await dp.feed_update(bot, update, trace=trace)
+        if not isinstance(result, TelegramMethod):
+            return None
+        if reply_in_response:
+            return result
+        await bot(result)
+        return None
+    finally:
+        update_log.record(update, trace.get("handler"), time.perf_counter() - start)
+
+def _webhook_reply(method: TelegramMethod) -> Optional[Dict[str, Any]]:
+    """Тіло відповіді вебхука з викликом методу; None, якщо метод вантажить файли."""
+    files: Dict[str, Any] = {}
+    payload: Dict[str, Any] = {"method": method.__api_method__}
+    markup = getattr(method, "reply_markup", None)
+    cached = bot.session.markup_value(bot, markup) if markup is not None else None
+    exclude = None
+    if cached is not None:
+        payload["reply_markup"] = cached
+        exclude = {"reply_markup"}
+    for key, value in method.model_dump(warnings=False, exclude=exclude).items():
+        value = bot.session.prepare_value(value, bot=bot, files=files, _dumps_json=False)
+        if value is not None:
+            payload[key] = value
+    return None if files else payload
+
+pool = UpdatePool(_process_update, WEBHOOK_WORKERS, WEBHOOK_QUEUE_SIZE) if WEBHOOK_ASYNC else None
+METRICS.gauge("bot_queue_depth", "Updates waiting in the worker pool.", lambda: pool.qsize() if pool else 0)
 
 async def _set_webhook_safely() -> bool:
     """Ставимо вебхук, не падаючи при помилці, повертаємо успіх True/False."""
@@ -43,9 +146,8 @@ async def _set_webhook_safely() -> bool:
         await bot.delete_webhook(drop_pending_updates=True)
         await asyncio.sleep(0.1)
 
-        allowed = ["message", "callback_query"]
-        log.info("Setting webhook to %s (allowed_updates=%s)", WEBHOOK_URL, allowed)
-        ok = await bot.set_webhook(url=WEBHOOK_URL, allowed_updates=allowed, max_connections=40)
+        log.info("Setting webhook to %s (allowed_updates=%s)", WEBHOOK_URL, ALLOWED_UPDATES)
+        ok = await bot.set_webhook(url=WEBHOOK_URL, allowed_updates=ALLOWED_UPDATES, max_connections=MAX_CONNECTIONS)
         if not ok:
             log.error("set_webhook returned False")
         return bool(ok)
@@ -53,23 +155,81 @@ async def _set_webhook_safely() -> bool:
         log.exception("set_webhook failed: %s", e)
         return False
 
+@contextmanager
+def _startup_lock() -> Iterator[bool]:
+    """True, якщо цей процес захопив WEBHOOK_LOCK; інші воркери отримують False."""
+    with open(WEBHOOK_LOCK, "w") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+async def _ensure_webhook() -> bool:
+    """Один get_webhook_info; set_webhook — лише якщо налаштування відрізняються.
+
+    Апдейти, що чекали під час рестарту, не скидаємо. Примусове перевстановлення —
+    /force_set_webhook.
+    """
+    try:
+        with _startup_lock() as leader:
+            if not leader:
+                log.info("Webhook is being checked by another worker")
+                return True
+            info = await bot.get_webhook_info()
+            webhook_info.set(info)
+            if (
+                info.url == WEBHOOK_URL
+                and set(info.allowed_updates or []) == set(ALLOWED_UPDATES)
+                and info.max_connections == MAX_CONNECTIONS
+            ):
+                log.info("Webhook is up to date")
+                return True
+            log.info("Setting webhook to %s (allowed_updates=%s)", WEBHOOK_URL, ALLOWED_UPDATES)
+            ok = await bot.set_webhook(url=WEBHOOK_URL, allowed_updates=ALLOWED_UPDATES, max_connections=MAX_CONNECTIONS)
+            webhook_info.expire()
+            if not ok:
+                log.error("set_webhook returned False")
+            return bool(ok)
+    except Exception as e:
+        log.exception("Webhook check failed: %s", e)
+        return False
+
 # ----- LIFECYCLE -----
 @app.on_event("startup")
 async def on_startup() -> None:
-    # Не валимо сервіс, навіть якщо set_webhook не вдався.
-    await _set_webhook_safely()
-    await asyncio.sleep(0.2)
+    started = time.perf_counter()
+    CONTACTS.start(CONFIG_POLL_INTERVAL)
+    if pool is not None:
+        pool.start()
+    # Не валимо сервіс, навіть якщо вебхук не вдалося звірити.
+    await asyncio.gather(PREFS.start(lambda: SqlitePrefsBackend(PREFS_DB), PREFS_FLUSH_INTERVAL, PREFS_POLL_INTERVAL), _ensure_webhook())
+    webhook_info.start(WEBHOOK_INFO_REFRESH)
+    log.info("Startup finished in %.0f ms", (time.perf_counter() - started) * 1000)
 
 @app.on_event("shutdown")
 async def on_shutdown() -> None:
+    # Спершу доробляємо апдейти з черги — їм ще потрібні сесія бота й конфіг
+    if pool is not None:
+        await pool.stop()
+    await webhook_info.stop()
+    await CONTACTS.stop()
+    await PREFS.stop()
     await bot.session.close()
+    stop_logging()
 
 # ----- ROUTES -----
+# Монітори опитують / кожні кілька секунд — віддаємо знімок; ?fresh=1 — живий запит
 @app.get("/")
-async def root() -> Dict[str, Any]:
-    info = await bot.get_webhook_info()
+async def root(fresh: bool = False) -> Dict[str, Any]:
+    info = await webhook_info.get(fresh=fresh)
     return {
         "status": "ok",
+        "duplicates_dropped": recent_updates.dropped,
         "webhook": {
             "expected": WEBHOOK_URL,
             "url": info.url,
@@ -80,6 +240,7 @@ async def root() -> Dict[str, Any]:
             "allowed_updates": info.allowed_updates,
             "last_error_date": info.last_error_date,
             "last_error_message": info.last_error_message,
+            "snapshot": webhook_info.meta(),
         },
     }
 
@@ -93,14 +254,25 @@ async def root_head() -> Response:
 async def health() -> Dict[str, bool]:
     return {"ok": True}
 
+# Метрики у форматі Prometheus
+@app.get("/metrics")
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
 # Ручне форс-ставлення вебхука (на випадок збоїв)
 @app.get("/force_set_webhook")
 async def force_set_webhook() -> Dict[str, Any]:
     ok = await _set_webhook_safely()
-    info = await bot.get_webhook_info()
+    # Після зміни вебхука знімок точно застарів — чекаємо на запит, що почався вже після неї
+    info = await webhook_info.refresh(after_change=True)
     return {
         "forced": ok,
-        "webhook": {"expected": WEBHOOK_URL, "url": info.url, "last_error_message": info.last_error_message},
+        "webhook": {
+            "expected": WEBHOOK_URL,
+            "url": info.url,
+            "last_error_message": info.last_error_message,
+            "snapshot": webhook_info.meta(),
+        },
     }
 
 # GET для швидкого чеку у браузері (той самий шлях, що і POST)
@@ -115,11 +287,30 @@ async def webhook_post(request: Request) -> JSONResponse:
     if token_in_path != BOT_TOKEN:
         raise HTTPException(status_code=403, detail="Invalid token")
 
-    data = await request.json()
-    log.info("Update received: %s", data)
     try:
-        update = Update.model_validate(data)
-        await dp.feed_update(bot, update)
+        data = loads(await request.body())
+        update_id = data.get("update_id") if isinstance(data, dict) else None
+        if isinstance(update_id, int) and recent_updates.seen(update_id):
+            # Повторна доставка — підтверджуємо, але вдруге не обробляємо
+            log.info("Duplicate update %s skipped", update_id)
+            webhook_skipped.inc("duplicate")
+            return JSONResponse({"ok": True})
+        if WEBHOOK_FASTPATH and not ROUTES.accepts(data):
+            webhook_skipped.inc("no_route")
+            return JSONResponse({"ok": True})
+
+        # context з ботом — інакше feed_update перебудовує Update через JSON вдруге
+        update = Update.model_validate(data, context={"bot": bot})
+        if pool is not None:
+            await pool.put(update)
+            return JSONResponse({"ok": True})
+
+        method = await _process_update(update, reply_in_response=WEBHOOK_REPLY_IN_RESPONSE)
+        if method is not None:
+            payload = _webhook_reply(method)
+            if payload is not None:
+                return JSONResponse(payload)
+            await bot(method)
         return JSONResponse({"ok": True})
     except Exception as e:
         log.exception("Error while processing update: %s", e)
@@ -0,0 +1,112 @@
+# snapshot.py
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Generic, Optional, TypeVar
+
+log = logging.getLogger("snapshot")
+
+T = TypeVar("T")
+
+
+class Snapshot(Generic[T]):
+    """Останній результат асинхронного запиту з TTL і фоновим оновленням.
+
+    Одночасні refresh() зливаються в один запит. Якщо оновлення не вдалося,
+    лишається попереднє значення з позначкою stale та текстом помилки.
+    """
+
+    def __init__(self, fetch: Callable[[], Awaitable[T]], ttl: float):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.value: Optional[T] = None
+        self.last_error: Optional[str] = None
+        self._fetched_at: Optional[float] = None
+        self._expired = False
+        self._inflight: Optional["asyncio.Future[T]"] = None
+        self._task: Optional[asyncio.Task] = None
+        self._expire_task: Optional[asyncio.Task] = None
+
+    def set(self, value: T) -> None:
+        self.value = value
+        self.last_error = None
+        self._fetched_at = time.monotonic()
+        self._expired = False
+
+    def expire(self) -> None:
+        """Значення застаріло (напр. вебхук щойно змінили) — оновлюємо у фоні."""
+        self._expired = True
+        if self._expire_task is None or self._expire_task.done():
+            self._expire_task = asyncio.create_task(self._refresh_quietly())
+
+    @property
+    def age(self) -> Optional[float]:
+        return None if self._fetched_at is None else time.monotonic() - self._fetched_at
+
+    @property
+    def stale(self) -> bool:
+        age = self.age
+        return self._expired or age is None or age > self.ttl
+
+    async def refresh(self, after_change: bool = False) -> T:
+        """Спільний запит. `after_change` — лише запит, що почався після цього виклику:
+        той, що вже летить, міг піти до зміни і повернути старе значення."""
+        if after_change and self._inflight is not None:
+            try:
+                await asyncio.shield(self._inflight)
+            except Exception:
+                pass
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._fetch())
+        # shield — скасування одного з очікувачів не скасовує спільний запит
+        return await asyncio.shield(self._inflight)
+
+    async def _fetch(self) -> T:
+        try:
+            value = await self.fetch()
+            self.set(value)
+            return value
+        except Exception as e:
+            self.last_error = str(e)
+            raise
+        finally:
+            self._inflight = None
+
+    async def _refresh_quietly(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as e:
+            log.warning("Snapshot refresh failed: %s", e)
+
+    async def get(self, fresh: bool = False) -> T:
+        """Знімок без запиту; `fresh` або відсутність значення — чекаємо на запит."""
+        if fresh or self.value is None:
+            return await self.refresh()
+        return self.value
+
+    def meta(self) -> Dict[str, Any]:
+        age = self.age
+        return {
+            "age_seconds": None if age is None else round(age, 1),
+            "stale": self.stale,
+            "last_error": self.last_error,
+        }
+
+    async def _loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self._refresh_quietly()
+
+    def start(self, interval: float) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(interval))
+
+    async def stop(self) -> None:
+        for task in (self._task, self._expire_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = self._expire_task = None
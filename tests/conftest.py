@@ -0,0 +1,22 @@
+# tests/conftest.py
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# bot.py і server.py читають змінні середовища при імпорті — задаємо їх до першого імпорту,
+# щоб тести не писали в робочі media_cache.json / prefs.sqlite3
+_tmp = Path(tempfile.mkdtemp(prefix="bot-tests-"))
+os.environ.update(
+    BOT_TOKEN="42:TEST",
+    WEBHOOK_BASE="https://tests.invalid",
+    PREFS_DB=str(_tmp / "prefs.sqlite3"),
+    MEDIA_CACHE_PATH=str(_tmp / "media_cache.json"),
+    WEBHOOK_LOCK=str(_tmp / "webhook.lock"),
+    WEBHOOK_ASYNC="0",
+    WEBHOOK_REPLY_IN_RESPONSE="1",
+    LOG_LEVEL="WARNING",
+)
@@ -0,0 +1,21 @@
+# tests/test_dedup.py
+import pytest
+
+from dedup import UpdateWindow
+
+
+def test_window_forgets_oldest() -> None:
+    window = UpdateWindow(2)
+    assert [window.seen(i) for i in (1, 2, 1, 3, 1)] == [False, False, True, False, False]
+    assert window.dropped == 1
+
+
+def test_zero_capacity_disables_window() -> None:
+    window = UpdateWindow(0)
+    assert not window.seen(1)
+    assert not window.seen(1)
+
+
+def test_negative_capacity_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        UpdateWindow(-1)
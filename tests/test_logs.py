@@ -0,0 +1,18 @@
+# tests/test_logs.py
+import logging
+import queue
+
+from logs import RedactingQueueHandler, _mask, redact_key
+
+
+def test_mask_depends_on_key() -> None:
+    assert _mask(100500, redact_key("a")) == _mask(100500, redact_key("a"))
+    assert _mask(100500, redact_key("a")) != _mask(100500, redact_key("b"))
+
+
+def test_url_quoted_token_is_redacted() -> None:
+    handler = RedactingQueueHandler(queue.SimpleQueue(), secrets=["42:TOKEN"])
+    record = logging.LogRecord(
+        "uvicorn.access", logging.INFO, __file__, 1, '%s - "%s %s"', ("127.0.0.1", "POST", "/webhook/42%3ATOKEN"), None
+    )
+    assert "TOKEN" not in handler.prepare(record).msg
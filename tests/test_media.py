@@ -0,0 +1,20 @@
+# tests/test_media.py
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from media import MediaCache
+
+
+def test_concurrent_saves_do_not_collide(tmp_path: Path) -> None:
+    # Два воркери з одним файлом кешу
+    store = tmp_path / "media_cache.json"
+    caches = [MediaCache(tmp_path) for _ in range(2)]
+    for i, cache in enumerate(caches):
+        cache.open(store)
+        cache._entries["banner.png"] = {"file_id": f"worker-{i}"}
+    with ThreadPoolExecutor(4) as pool:
+        list(pool.map(lambda i: caches[i % 2]._save(), range(200)))
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["media_cache.json"]
+    fresh = MediaCache(tmp_path)
+    fresh.open(store)
+    assert fresh._entries["banner.png"]["file_id"] in ("worker-0", "worker-1")
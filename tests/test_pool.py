@@ -0,0 +1,82 @@
+# tests/test_pool.py
+import asyncio
+from typing import List
+
+import pytest
+from aiogram.types import Update
+
+from pool import UpdatePool
+
+
+def _update(update_id: int, chat_id: int) -> Update:
+    return Update.model_validate({
+        "update_id": update_id,
+        "message": {"message_id": update_id, "date": 0, "chat": {"id": chat_id, "type": "private"}, "text": "x"},
+    })
+
+
+def test_same_chat_is_processed_in_order() -> None:
+    done: List[int] = []
+
+    async def process(update: Update) -> None:
+        # Перший апдейт повільніший: без впорядкування другий обігнав би його
+        await asyncio.sleep(0.05 if update.update_id == 1 else 0)
+        done.append(update.update_id)
+
+    async def main() -> None:
+        pool = UpdatePool(process, workers=2, maxsize=10)
+        pool.start()
+        await pool.put(_update(1, chat_id=7))
+        await pool.put(_update(2, chat_id=7))
+        await pool.stop()
+
+    asyncio.run(main())
+    assert done == [1, 2]
+
+
+def test_stop_drains_queue_and_rejects_new_updates() -> None:
+    done: List[int] = []
+
+    async def process(update: Update) -> None:
+        await asyncio.sleep(0.01)
+        done.append(update.update_id)
+
+    async def main() -> None:
+        pool = UpdatePool(process, workers=2, maxsize=10)
+        pool.start()
+        for i in range(6):
+            await pool.put(_update(i, chat_id=i))
+        await pool.stop()
+        with pytest.raises(RuntimeError):
+            await pool.put(_update(99, chat_id=1))
+
+    asyncio.run(main())
+    assert sorted(done) == list(range(6))
+
+
+def test_full_queue_blocks_put() -> None:
+    async def main() -> bool:
+        gate = asyncio.Event()
+
+        async def process(update: Update) -> None:
+            await gate.wait()
+
+        pool = UpdatePool(process, workers=1, maxsize=1)
+        pool.start()
+        await pool.put(_update(1, chat_id=1))  # воркер узяв його й чекає
+        await asyncio.sleep(0)
+        await pool.put(_update(2, chat_id=1))  # заповнює чергу
+        blocked = asyncio.ensure_future(pool.put(_update(3, chat_id=1)))
+        await asyncio.sleep(0.02)
+        waiting = not blocked.done()
+        gate.set()
+        await blocked
+        await pool.stop()
+        return waiting
+
+    assert asyncio.run(main())
+
+
+def test_zero_workers_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        UpdatePool(lambda update: asyncio.sleep(0), workers=0, maxsize=10)
@@ -0,0 +1,99 @@
+# tests/test_prefs.py
+import asyncio
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Tuple
+
+from prefs import PrefStore, Rows, SqlitePrefsBackend
+
+
+class SlowBackend(SqlitePrefsBackend):
+    """Повільні write/changes, що рахують, чи виконувались вони одночасно."""
+
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self.active = 0
+        self.overlaps = 0
+        self._count = threading.Lock()
+
+    def _enter(self) -> None:
+        with self._count:
+            self.active += 1
+            if self.active > 1:
+                self.overlaps += 1
+        time.sleep(0.005)
+
+    def _leave(self) -> None:
+        with self._count:
+            self.active -= 1
+
+    def write(self, items: Dict[int, str]) -> None:
+        self._enter()
+        try:
+            super().write(items)
+        finally:
+            self._leave()
+
+    def changes(self, since: int) -> Tuple[Rows, int]:
+        self._enter()
+        try:
+            return super().changes(since)
+        finally:
+            self._leave()
+
+
+def test_flush_and_poll_never_overlap(tmp_path: Path) -> None:
+    backend = SlowBackend(tmp_path / "prefs.sqlite3")
+
+    async def main() -> None:
+        store = PrefStore(default="ru")
+        await store.start(lambda: backend, flush_interval=0.001, poll_interval=0.001)
+        for i in range(50):
+            store.set(i, "en" if i % 2 else "ka")
+            await asyncio.sleep(0.002)
+        await store.stop()
+
+    asyncio.run(main())
+    assert backend.overlaps == 0
+
+
+def test_local_choice_survives_poll(tmp_path: Path) -> None:
+    path = tmp_path / "prefs.sqlite3"
+    other = SqlitePrefsBackend(path)
+    other.write({1: "ka"})
+
+    async def main() -> str:
+        store = PrefStore(default="ru")
+        await store.start(lambda: SqlitePrefsBackend(path), flush_interval=0.001, poll_interval=0.001)
+        store.set(1, "en")
+        await asyncio.sleep(0.05)
+        value = store.get(1)
+        await store.stop()
+        return value
+
+    assert asyncio.run(main()) == "en"
+    other.close()
+
+
+def test_failed_load_does_not_abort_start(tmp_path: Path) -> None:
+    path = tmp_path / "prefs.sqlite3"
+    SqlitePrefsBackend(path).write({1: "ka"})
+    attempts = []
+
+    def open_backend() -> SqlitePrefsBackend:
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OSError("database is locked")
+        return SqlitePrefsBackend(path)
+
+    async def main() -> Tuple[str, str]:
+        store = PrefStore(default="ru")
+        await store.start(open_backend, flush_interval=0.001, poll_interval=0.001)
+        before = store.get(1)
+        await asyncio.sleep(0.05)
+        after = store.get(1)
+        await store.stop()
+        return before, after
+
+    assert asyncio.run(main()) == ("ru", "ka")
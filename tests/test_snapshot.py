@@ -0,0 +1,54 @@
+# tests/test_snapshot.py
+import asyncio
+
+from snapshot import Snapshot
+
+
+def test_expire_marks_stale_and_refreshes_once() -> None:
+    calls = []
+
+    async def fetch() -> int:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    async def main() -> None:
+        snapshot = Snapshot(fetch, ttl=60)
+        snapshot.set(0)
+        snapshot.expire()
+        snapshot.expire()
+        meta = snapshot.meta()
+        assert meta["stale"] and meta["age_seconds"] is not None
+        await asyncio.sleep(0.05)
+        assert snapshot.value == 1 and not snapshot.stale
+        await snapshot.stop()
+
+    asyncio.run(main())
+    assert len(calls) == 1
+
+
+def test_refresh_after_change_skips_fetch_in_flight() -> None:
+    async def main() -> None:
+        gate = asyncio.Event()
+        calls = []
+
+        async def fetch() -> int:
+            calls.append(1)
+            number = len(calls)
+            if number == 1:
+                await gate.wait()  # запит, що пішов до зміни
+            return number
+
+        snapshot = Snapshot(fetch, ttl=60)
+        early = asyncio.ensure_future(snapshot.refresh())
+        await asyncio.sleep(0)
+        late = asyncio.ensure_future(snapshot.refresh(after_change=True))
+        joined = asyncio.ensure_future(snapshot.refresh())
+        await asyncio.sleep(0)
+        gate.set()
+        assert await early == 1
+        assert await joined == 1
+        assert await late == 2
+        assert snapshot.value == 2
+
+    asyncio.run(main())
@@ -0,0 +1,141 @@
+# tests/test_webhook.py
+"""webhook_post проти фейкового Bot API з bench/fake_api.py."""
+import asyncio
+import itertools
+import random
+from typing import Any, Dict, Tuple
+
+import httpx
+import pytest
+from aiogram.client.telegram import TelegramAPIServer
+
+import server
+from bench.corpus import make_update
+from bench.fake_api import FakeBotAPI
+from pool import UpdatePool
+
+_update_ids = itertools.count(1)
+
+
+def _update(kind: str) -> Dict[str, Any]:
+    # Кожен тест бере нові update_id, інакше їх відкине вікно дедуплікації
+    return make_update(kind, next(_update_ids), 100500, random.Random(0))
+
+
+async def _post(update: Any, async_pool: bool = False) -> Tuple[Dict[str, Any], FakeBotAPI]:
+    api = FakeBotAPI()
+    server.bot.session.api = TelegramAPIServer.from_base(await api.start())
+    if async_pool:
+        server.pool = UpdatePool(server._process_update, workers=2, maxsize=10)
+        server.pool.start()
+    try:
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="https://tests.invalid") as client:
+            if isinstance(update, bytes):
+                response = await client.post(server.WEBHOOK_PATH, content=update)
+            else:
+                response = await client.post(server.WEBHOOK_PATH, json=update)
+        assert response.status_code == 200
+        if server.pool is not None:
+            await server.pool.stop()
+        return response.json(), api
+    finally:
+        await server.bot.session.close()
+        await api.stop()
+
+
+@pytest.fixture(autouse=True)
+def sync_mode(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(server, "pool", None)
+    monkeypatch.setattr(server, "WEBHOOK_REPLY_IN_RESPONSE", True)
+
+
+def test_ping_is_answered_in_response() -> None:
+    update = _update("start")
+    update["message"]["text"] = "/ping"
+    update["message"]["entities"][0]["length"] = 5
+    body, api = asyncio.run(_post(update))
+    assert body["method"] == "sendMessage"
+    assert body["text"] == "pong"
+    assert body["chat_id"] == 100500
+    assert api.count() == 0
+
+
+def test_contacts_reply_carries_cached_keyboard() -> None:
+    body, api = asyncio.run(_post(_update("contacts")))
+    assert body["method"] == "sendMessage"
+    assert body["reply_markup"]["keyboard"]
+    assert api.count() == 0
+
+
+def test_banner_upload_falls_back_to_request() -> None:
+    body, api = asyncio.run(_post(_update("start")))
+    assert body == {"ok": True}
+    assert api.count("sendPhoto") == 1
+
+
+def test_reply_in_response_disabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(server, "WEBHOOK_REPLY_IN_RESPONSE", False)
+    body, api = asyncio.run(_post(_update("contacts")))
+    assert body == {"ok": True}
+    assert api.count("sendMessage") == 1
+
+
+def test_async_mode_never_replies_in_response() -> None:
+    body, api = asyncio.run(_post(_update("contacts"), async_pool=True))
+    assert body == {"ok": True}
+    assert api.count("sendMessage") == 1
+
+
+def test_command_in_photo_caption_is_routed() -> None:
+    update = _update("start")
+    message = update["message"]
+    del message["text"], message["entities"]
+    message["photo"] = [{"file_id": "p", "file_unique_id": "u", "width": 1, "height": 1}]
+    message["caption"] = "/ping"
+    message["caption_entities"] = [{"type": "bot_command", "offset": 0, "length": 5}]
+    body, _ = asyncio.run(_post(update))
+    assert body["text"] == "pong"
+
+
+@pytest.mark.parametrize("payload", [[1, 2], {"message": 5}, {"callback_query": "x"}])
+def test_malformed_body_is_rejected_with_200(payload: Any) -> None:
+    if isinstance(payload, dict):
+        payload = {"update_id": next(_update_ids), **payload}
+    body, _ = asyncio.run(_post(payload))
+    assert body["ok"] is False
+
+
+def test_force_set_webhook_returns_refreshed_info() -> None:
+    async def main() -> Tuple[Dict[str, Any], FakeBotAPI]:
+        api = FakeBotAPI()
+        server.bot.session.api = TelegramAPIServer.from_base(await api.start())
+        try:
+            transport = httpx.ASGITransport(app=server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="https://tests.invalid") as client:
+                response = await client.get("/force_set_webhook")
+            return response.json(), api
+        finally:
+            await server.bot.session.close()
+            await api.stop()
+
+    body, api = asyncio.run(main())
+    assert body["forced"] is True
+    assert body["webhook"]["url"] == server.WEBHOOK_URL
+    assert body["webhook"]["snapshot"]["stale"] is False
+    assert api.count("getWebhookInfo") == 1
+
+
+@pytest.mark.parametrize("text", ["/", "/ ", "/\n", "/ start"])
+def test_bare_slash_is_skipped_quietly(text: str) -> None:
+    update = _update("start")
+    update["message"]["text"] = text
+    del update["message"]["entities"]
+    body, api = asyncio.run(_post(update))
+    assert body == {"ok": True}
+    assert api.count() == 0
+
+
+def test_non_json_body_is_rejected_with_200() -> None:
+    body, _ = asyncio.run(_post(b"not json"))
+    assert body["ok"] is False